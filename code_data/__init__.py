@@ -237,6 +237,16 @@ class Constant(DataclassHideDefault):
             return False
         return constant_key(self.constant) == constant_key(__o.constant)
 
+    def __hash__(self) -> int:
+        # Only values which can hold floats compare differently with their constant
+        # key (NaN, -0.0), so hash the key for those to be consistent with `__eq__`
+        # and hash the value directly for everything else, which is much cheaper.
+        if isinstance(self.constant, (float, complex, tuple, frozenset)):
+            from ._constants import constant_key
+
+            return hash((constant_key(self.constant), self._index_override))
+        return hash((self.constant, self._index_override))
+
 
 @dataclass(frozen=True)
 class Freevar(DataclassHideDefault):
@@ -296,10 +296,11 @@ def to_arg(
     found_cellvars: ToArgs[str],
     found_constants: ToArgs[ConstantValue],
 ) -> Arg:
-    if opcode in dis.hasjabs:
-        return Jump((2 if _ATLEAST_310 else 1) * arg, False)
-    elif opcode in dis.hasjrel:
-        return Jump(next_offset + ((2 if _ATLEAST_310 else 1) * arg), True)
+    jump_kind = _JUMP_KIND[opcode]
+    if jump_kind == _ABSOLUTE_JUMP:
+        return Jump(_JUMP_MULTIPLIER * arg, False)
+    elif jump_kind == _RELATIVE_JUMP:
+        return Jump(next_offset + (_JUMP_MULTIPLIER * arg), True)
     elif opcode in dis.hasname:
         return Name(*found_names.found_index(arg))
     elif opcode in dis.haslocal:
@@ -314,7 +315,7 @@ def to_arg(
     elif opcode in dis.hasconst:
         return Constant(*found_constants.found_index(arg))
     elif opcode < HAVE_ARGUMENT:
-        return NoArg(arg)
+        return NoArg(arg) if arg else _NO_ARG
     return arg
 
 
@@ -440,6 +441,22 @@ def verify_block(blocks: Blocks) -> None:
 # Bytecode instructions jumps refer to the instruction offset, instead of byte
 # offset in Python >= 3.10 due to this PR https://github.com/python/cpython/pull/25069
 _ATLEAST_310 = sys.version_info >= (3, 10)
+# The multiplier to go from a jump arg to a bytecode offset
+_JUMP_MULTIPLIER = 2 if _ATLEAST_310 else 1
+
+# Lookup table from opcode to what kind of jump it is, so we can check with one index
+# instead of searching through `dis.hasjabs` and `dis.hasjrel` for every instruction
+_NOT_JUMP, _ABSOLUTE_JUMP, _RELATIVE_JUMP = range(3)
+_JUMP_KIND = [_NOT_JUMP] * 256
+for _op in dis.hasjabs:
+    _JUMP_KIND[_op] = _ABSOLUTE_JUMP
+for _op in dis.hasjrel:
+    _JUMP_KIND[_op] = _RELATIVE_JUMP
+del _op
+
+# Share one instance for the no arg case, since almost all instructions without args
+# have a zero arg value
+_NO_ARG = NoArg()
 
 
 def _parse_bytes(b: bytes) -> Iterable[tuple[int, int, int, int, int]]:
@@ -456,11 +473,13 @@ def _parse_bytes(b: bytes) -> Iterable[tuple[int, int, int, int, int]]:
     """
     n_args: int = 0
     arg: int = 0
-    for i in range(0, len(b), 2):
-        opcode = b[i]
-        arg |= b[i + 1]
+    extended_arg = dis.EXTENDED_ARG
+    # Iterate over the opcode and arg bytes in parallel, instead of indexing into the
+    # bytes twice for each instruction
+    for i, opcode, arg_byte in zip(range(0, len(b), 2), b[::2], b[1::2]):
+        arg |= arg_byte
         n_args += 1
-        if opcode == dis.EXTENDED_ARG:
+        if opcode == extended_arg:
             arg = arg << 8
             # https://github.com/python/cpython/pull/31285
             if arg > _c_int_upper_limit:
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from math import isnan
 from types import CodeType
-from typing import Union
+from typing import Any, Callable, Union
 
 from . import CodeData, ConstantValue, InnerConstant
 
@@ -36,27 +36,70 @@ def inner_constant_key(value: ConstantValue) -> object:
     Similar to Python's `_PyCode_ConstantKey` except nan values area all replaced with
     a global
     """
+    # Dispatch on the exact type first, since constants are almost always builtins,
+    # and fall back to isinstance checks for subclasses.
+    key_fn = _KEY_FNS.get(type(value))
+    if key_fn is not None:
+        return key_fn(value)
     if isinstance(value, (str, type(None), bytes, type(...))):
         return value
     if isinstance(value, (bool, int)):
-        return (type(value), value)
+        return _int_key(value)
     if isinstance(value, float):
-        return (type(value), replace_nan(value), is_neg_zero(value))
+        return _float_key(value)
     if isinstance(value, complex):
-        return (
-            type(value),
-            replace_nan(value.real),
-            replace_nan(value.imag),
-            is_neg_zero(value.real),
-            is_neg_zero(value.imag),
-        )
+        return _complex_key(value)
     if isinstance(value, tuple):
-        return tuple(map(constant_key, value))
+        return _tuple_key(value)
     if isinstance(value, frozenset):
-        return frozenset(map(constant_key, value))
+        return _frozenset_key(value)
     raise NotImplementedError(f"Unsupported constant type: {type(value)}")
 
 
+def _identity_key(value: Any) -> object:
+    return value
+
+
+def _int_key(value: int) -> object:
+    return (type(value), value)
+
+
+def _float_key(value: float) -> object:
+    return (type(value), replace_nan(value), is_neg_zero(value))
+
+
+def _complex_key(value: complex) -> object:
+    return (
+        type(value),
+        replace_nan(value.real),
+        replace_nan(value.imag),
+        is_neg_zero(value.real),
+        is_neg_zero(value.imag),
+    )
+
+
+def _tuple_key(value: tuple) -> object:
+    return tuple(map(constant_key, value))
+
+
+def _frozenset_key(value: frozenset) -> object:
+    return frozenset(map(constant_key, value))
+
+
+_KEY_FNS: dict[type, Callable[[Any], object]] = {
+    str: _identity_key,
+    type(None): _identity_key,
+    bytes: _identity_key,
+    type(...): _identity_key,
+    bool: _int_key,
+    int: _int_key,
+    float: _float_key,
+    complex: _complex_key,
+    tuple: _tuple_key,
+    frozenset: _frozenset_key,
+}
+
+
 def is_neg_zero(value: float) -> bool:
     return str(value) == "-0.0"
 
@@ -18,10 +18,9 @@ To go backwards, each stage also has a reverse.
 
 from __future__ import annotations
 
-import collections
+import struct
 import sys
 from dataclasses import dataclass, field
-from itertools import chain
 from types import CodeType
 from typing import List, Optional, cast
 
@@ -32,6 +31,9 @@ from . import AdditionalLine
 # Whether to use the newer co_linetable field over the older co_lnotab
 USE_LINETABLE = sys.version_info >= (3, 10)
 
+# Each pair in the table is an unsigned bytecode offset and a signed line offset
+_LINE_TABLE_PAIR = struct.Struct(">Bb")
+
 
 def to_line_mapping(code: CodeType) -> LineMapping:
     """
@@ -58,6 +60,8 @@ def from_line_mapping(offset_to_line: LineMapping) -> bytes:
 
 @dataclass
 class LineTableItem:
+    __slots__ = ("line_offset", "bytecode_offset")
+
     line_offset: int
     bytecode_offset: int
 
@@ -67,6 +71,8 @@ ExpandedItems = List[LineTableItem]
 
 @dataclass
 class CollapsedLineTableItem:
+    __slots__ = ("line_offset", "bytecode_offset")
+
     # Is only None on Python 3.10+ when using line table
     line_offset: Optional[int]
     bytecode_offset: int
@@ -135,18 +141,10 @@ def bytes_to_items(b: bytes) -> ExpandedItems:
 
     Inverse of items_to_bytes.
     """
-    return cast(
-        ExpandedItems,
-        [
-            LineTableItem(
-                bytecode_offset=b[i],
-                # Convert byte for line offset into integer based on it being a signed
-                # integer
-                line_offset=int.from_bytes([b[i + 1]], "big", signed=True),
-            )
-            for i in range(0, len(b), 2)
-        ],
-    )
+    return [
+        LineTableItem(bytecode_offset=bytecode_offset, line_offset=line_offset)
+        for bytecode_offset, line_offset in _LINE_TABLE_PAIR.iter_unpack(b)
+    ]
 
 
 def items_to_bytes(items: ExpandedItems) -> bytes:
@@ -155,18 +153,14 @@ def items_to_bytes(items: ExpandedItems) -> bytes:
 
     Inverse of bytes_to_items.
     """
-    return bytes(
-        chain.from_iterable(
-            (
-                [
-                    item.bytecode_offset,
-                    # convert possibly negative int to signed integer
-                    item.line_offset & 255,
-                ]
-                for item in items
-            )
-        )
-    )
+    # Pack each pair into a preallocated buffer, instead of chaining together a list
+    # for each item. The struct converts the possibly negative line offset to a
+    # signed byte.
+    buf = bytearray(2 * len(items))
+    pack_into = _LINE_TABLE_PAIR.pack_into
+    for i, item in enumerate(items):
+        pack_into(buf, 2 * i, item.bytecode_offset, item.line_offset)
+    return bytes(buf)
 
 
 def collapse_items(items: ExpandedItems, is_linetable: bool) -> CollapsedItems:
@@ -194,34 +188,39 @@ def collapse_items(items: ExpandedItems, is_linetable: bool) -> CollapsedItems:
 
     # Iterate over the items, from the end to the begining.
     # If there is a zero and the previous is at the limit,
-    # then remove the current, and add it to the previous.
+    # then add the current to the previous, otherwise keep the current.
+    # The kept items are collected in reverse and flipped at the end, so that
+    # merging doesn't need to delete from the middle of the list.
+    reversed_items: CollapsedItems = []
+    max_bytecode_offset = 254 if is_linetable else 255
+    min_line_offset = -127 if is_linetable else -128
     for i in range(len(items) - 1, 0, -1):
         item = collapsed_items[i]
         prev_item = collapsed_items[i - 1]
-        # For the bytecode split, the previouse line offset should be zero
-        bytecode_offset_split = (
+        # For the bytecode split, the previouse line offset should be zero.
+        # However, when the line offset is split, the current bytecode offset should
+        # be zero. The line split is only checked if the bytecode split fails.
+        if (
             (item if is_linetable else prev_item).line_offset == 0
-            and prev_item.bytecode_offset >= (254 if is_linetable else 255)
+            and prev_item.bytecode_offset >= max_bytecode_offset
             and item.bytecode_offset != 0
-        )
-        # However, when the line offset is split, the current bytecode offset should be
-        # zero
-        line_offset_split = (
+        ) or (
             (prev_item if is_linetable else item).bytecode_offset == 0
             and (prev_item.line_offset is not None)
             and (
-                prev_item.line_offset >= 127
-                or prev_item.line_offset <= (-127 if is_linetable else -128)
+                prev_item.line_offset >= 127 or prev_item.line_offset <= min_line_offset
             )
             and item.line_offset != 0
-        )
-        # Bytecode offset too large, so split between two
-        if bytecode_offset_split or line_offset_split:
-            del collapsed_items[i]
+        ):
             if item.line_offset:
                 prev_item.line_offset += item.line_offset  # type: ignore
             prev_item.bytecode_offset += item.bytecode_offset
-    return collapsed_items
+        else:
+            reversed_items.append(item)
+    if collapsed_items:
+        reversed_items.append(collapsed_items[0])
+    reversed_items.reverse()
+    return reversed_items
 
 
 def expand_items(items: CollapsedItems, is_linetable: bool) -> ExpandedItems:
@@ -231,66 +230,69 @@ def expand_items(items: CollapsedItems, is_linetable: bool) -> ExpandedItems:
 
     Inverse of collapse_items.
     """
-    expanded_items = cast(ExpandedItems, [])
-    MAX_BYTECODE = 254 if is_linetable else 255
-    MIN_LINE = -127 if is_linetable else -128
+    expanded_items: ExpandedItems = []
     for item in items:
         line_offset = item.line_offset
         bytecode_offset = item.bytecode_offset
         emitted_extra = False
 
-        def expand_bytecode():
-            nonlocal bytecode_offset, line_offset, emitted_extra
-            # While the bytecode offset is too large, emit the 0, 255 item
-            while bytecode_offset > MAX_BYTECODE:
+        # The line table splits the line offset before the bytecode offset,
+        # whereas the lnotab splits the bytecode offset first.
+        if is_linetable:
+            # While the line offset is too large, emit the max line offset with
+            # no bytecode offset
+            while line_offset is not None and line_offset > 127:
+                expanded_items.append(LineTableItem(line_offset=127, bytecode_offset=0))
+                line_offset -= 127
+                emitted_extra = True
+
+            # Same if its too small
+            while line_offset is not None and line_offset < -127:
                 expanded_items.append(
-                    LineTableItem(
-                        line_offset=(-128 if line_offset is None else line_offset)
-                        if is_linetable
-                        else 0,
-                        bytecode_offset=MAX_BYTECODE,
-                    )
+                    LineTableItem(line_offset=-127, bytecode_offset=0)
                 )
-                if is_linetable:
-                    line_offset = 0
-                bytecode_offset -= MAX_BYTECODE
+                line_offset += 127
                 emitted_extra = True
 
-        def expand_line():
-            nonlocal bytecode_offset, line_offset, emitted_extra
-            # While the line offset is too large, emit the max line offset and remaining
-            # bytecode offset
-            while line_offset is not None and line_offset > 127:
+            # While the bytecode offset is too large, emit the line offset with the
+            # max bytecode offset, and then continue with a zero line offset
+            while bytecode_offset > 254:
                 expanded_items.append(
                     LineTableItem(
-                        line_offset=127,
-                        bytecode_offset=0 if is_linetable else bytecode_offset,
+                        line_offset=-128 if line_offset is None else line_offset,
+                        bytecode_offset=254,
                     )
                 )
+                line_offset = 0
+                bytecode_offset -= 254
+                emitted_extra = True
+        else:
+            # While the bytecode offset is too large, emit the 0, 255 item
+            while bytecode_offset > 255:
+                expanded_items.append(LineTableItem(line_offset=0, bytecode_offset=255))
+                bytecode_offset -= 255
+                emitted_extra = True
+
+            # While the line offset is too large, emit the max line offset and
+            # remaining bytecode offset
+            line_offset = cast(int, line_offset)
+            while line_offset > 127:
+                expanded_items.append(
+                    LineTableItem(line_offset=127, bytecode_offset=bytecode_offset)
+                )
                 line_offset -= 127
-                if not is_linetable:
-                    bytecode_offset = 0
+                bytecode_offset = 0
                 emitted_extra = True
 
             # Same if its too small
-            while line_offset is not None and line_offset < MIN_LINE:
+            while line_offset < -128:
                 expanded_items.append(
-                    LineTableItem(
-                        line_offset=MIN_LINE,
-                        bytecode_offset=0 if is_linetable else bytecode_offset,
-                    )
+                    LineTableItem(line_offset=-128, bytecode_offset=bytecode_offset)
                 )
-                line_offset -= MIN_LINE
-                if not is_linetable:
-                    bytecode_offset = 0
+                line_offset += 128
+                bytecode_offset = 0
                 emitted_extra = True
 
-        if is_linetable:
-            expand_line()
-            expand_bytecode()
-        else:
-            expand_bytecode()
-            expand_line()
         # If we have extra we haven't emited, add a last one.
         # Also emit a last one, even if we don't and we had a negative jump
         # (for some reason this always emits an extra jump)
@@ -315,63 +317,60 @@ def items_to_mapping(
     redundant, to preserve isomorphism with mapping_to_items.
     """
     offset_to_line: dict[int, Optional[int]] = {}
-    offset_to_additional_line_offsets: dict[int, list[int]] = collections.defaultdict(
-        list
-    )
-    current_item_offset = 0
-    last_bytecode_offset = 0
+    offset_to_additional_line_offsets: dict[int, list[int]] = {}
     current_line = 0
     bytecode_offset = 0
     if is_linetable:
         for item in items:
-            if item.line_offset is not None:
+            if item.line_offset is None:
+                line = None
+            else:
                 current_line += item.line_offset
-            for i in range(bytecode_offset, bytecode_offset + item.bytecode_offset, 2):
-                offset_to_line[i] = None if item.line_offset is None else current_line
-            bytecode_offset += item.bytecode_offset
+                line = current_line
+            next_bytecode_offset = bytecode_offset + item.bytecode_offset
+            # Every offset in this item maps to the same line, so resolve it once
+            # and keep the inner loop to a single store per offset
+            for i in range(bytecode_offset, next_bytecode_offset, 2):
+                offset_to_line[i] = line
+            bytecode_offset = next_bytecode_offset
         return LineMapping(offset_to_line, {})
-    # Iterate through each bytecode offset and find the line number for it
-    # Also, if our bytecode offset exceeds the max code offset, keep iterating
-    # till our items are done, so that we include offsets for bytecode which
-    # were eliminated during optimization
-    while (bytecode_offset < max_offset) or current_item_offset < len(items):
-        # if we haven't exhausted all the line table items
-        if current_item_offset < len(items):
-            # and the current bytecode offset difference is equal to the next line table
-            # item difference, then advance the line table item.
-            current_item = items[current_item_offset]
-            if (bytecode_offset - last_bytecode_offset) == current_item.bytecode_offset:
-                current_line += current_item.line_offset  # type: ignore
-                current_item_offset += 1
-                last_bytecode_offset = bytecode_offset
-
-                # If the line_offset is 0, this is really a noop, so add to dict
-                # to preserve isomporphism of this transform.
-                # (only happens in Python <= 3.8 for things like
-                # `class A: pass\n class A: pass` )
-                if current_item.line_offset == 0:
-                    offset_to_additional_line_offsets[bytecode_offset].append(0)
-
-            # special case for if the bytecode offset difference of this item is 0 and
-            # this is not the first item.
-            # If this is the case, then line changes should be recorded
-            while (
-                current_item_offset < len(items)
-                and items[current_item_offset].bytecode_offset == 0
-            ):
-                line_offset = items[current_item_offset].line_offset
-                offset_to_additional_line_offsets[bytecode_offset].append(
-                    cast(int, line_offset)
-                )
-                current_item_offset += 1
-                current_line += cast(int, line_offset)
-        # Otherwise save as the current line
-        offset_to_line[bytecode_offset] = current_line
-        bytecode_offset += 2
+    # Iterate through each item, and fill in the line number for all the bytecode
+    # offsets up to the offset where the item applies.
+    started = False
+    for item in items:
+        line_offset = cast(int, item.line_offset)
+        # special case for if the bytecode offset difference of this item is 0 and
+        # this is not the first item.
+        # If this is the case, then line changes should be recorded
+        if started and item.bytecode_offset == 0:
+            offset_to_additional_line_offsets.setdefault(bytecode_offset, []).append(
+                line_offset
+            )
+            current_line += line_offset
+            continue
+        started = True
+        next_bytecode_offset = bytecode_offset + item.bytecode_offset
+        for i in range(bytecode_offset, next_bytecode_offset, 2):
+            offset_to_line[i] = current_line
+        bytecode_offset = next_bytecode_offset
+        current_line += line_offset
+
+        # If the line_offset is 0, this is really a noop, so add to dict
+        # to preserve isomporphism of this transform.
+        # (only happens in Python <= 3.8 for things like
+        # `class A: pass\n class A: pass` )
+        if line_offset == 0:
+            offset_to_additional_line_offsets.setdefault(bytecode_offset, []).append(0)
+    # Fill in the rest of the offsets with the last line. If the items went past the
+    # max code offset, still include the offset of the last item, so that we include
+    # offsets for bytecode which were eliminated during optimization
+    end_offset = max(max_offset, bytecode_offset + 2) if started else max_offset
+    for i in range(bytecode_offset, end_offset, 2):
+        offset_to_line[i] = current_line
 
     return LineMapping(
         offset_to_line=offset_to_line,
-        offset_to_additional_line_offsets=dict(offset_to_additional_line_offsets),
+        offset_to_additional_line_offsets=offset_to_additional_line_offsets,
     )
 
 
@@ -383,7 +382,7 @@ def mapping_to_items(mapping: LineMapping, is_linetable: bool) -> CollapsedItems
     Also include any additional items that were emitted, to preserve isomorphism with
     items_to_mapping.
     """
-    items = cast(CollapsedItems, [])
+    items: CollapsedItems = []
     # The line table uses a different offset form, where the lines changed
     # are added at the end, instead of begining of a section
     if is_linetable:
@@ -437,23 +436,33 @@ def mapping_to_items(mapping: LineMapping, is_linetable: bool) -> CollapsedItems
 
     last_line_number = 0
     last_bytecode_offset = 0
-
-    for bytecode_offset, line_number in mapping.offset_to_line.items():
-        additional_line_offsets = mapping.offset_to_additional_line_offsets.get(
-            bytecode_offset, []
-        )
-
-        first_line_offset = (
-            cast(int, line_number) - last_line_number - sum(additional_line_offsets)
-        )
-
-        # We should emit line offsets for each additional one, plus the first
-        # if it is nonzero
-        all_line_offsets = list(additional_line_offsets)
-        if first_line_offset:
-            all_line_offsets.insert(0, first_line_offset)
-        # Emit a list of bytecode offsets
-        for line_offset in all_line_offsets:
+    offset_to_additional_line_offsets = mapping.offset_to_additional_line_offsets
+
+    # Without the line table, every offset has a line number
+    offset_to_line = cast("dict[int, int]", mapping.offset_to_line)
+
+    for bytecode_offset, line_number in offset_to_line.items():
+        line_offset = line_number - last_line_number
+        # Additional lines are rare, so only look them up for offsets that have them
+        if bytecode_offset in offset_to_additional_line_offsets:
+            additional_line_offsets = offset_to_additional_line_offsets[bytecode_offset]
+            first_line_offset = line_offset - sum(additional_line_offsets)
+
+            # We should emit line offsets for each additional one, plus the first
+            # if it is nonzero
+            all_line_offsets = list(additional_line_offsets)
+            if first_line_offset:
+                all_line_offsets.insert(0, first_line_offset)
+            # Emit a list of bytecode offsets
+            for line_offset in all_line_offsets:
+                items.append(
+                    CollapsedLineTableItem(
+                        line_offset=line_offset,
+                        bytecode_offset=bytecode_offset - last_bytecode_offset,
+                    )
+                )
+                last_bytecode_offset = bytecode_offset
+        elif line_offset:
             items.append(
                 CollapsedLineTableItem(
                     line_offset=line_offset,
@@ -461,6 +470,6 @@ def mapping_to_items(mapping: LineMapping, is_linetable: bool) -> CollapsedItems
                 )
             )
             last_bytecode_offset = bytecode_offset
-        last_line_number = cast(int, line_number)
+        last_line_number = line_number
 
     return items
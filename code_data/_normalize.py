@@ -1,45 +1,117 @@
 from __future__ import annotations
 
-from dataclasses import replace
-from typing import TypeVar, cast
+from typing import Any, Callable, TypeVar, cast
 
-from . import Cellvar, CodeData, Constant, Instruction, Name, NoArg, Varname
+from . import (
+    Cellvar,
+    CodeData,
+    Constant,
+    Freevar,
+    Instruction,
+    Jump,
+    Name,
+    NoArg,
+    Varname,
+)
 
 T = TypeVar("T")
 
 
 def normalize(x: T) -> T:
-
+    tp = type(x)
+    # Most values are leaves which are returned unchanged, so check for them first
+    if tp in _LEAF_TYPES:
+        return x
+    # Then dispatch on the exact type, and only fall back to the isinstance checks
+    # for subclasses
+    normalize_fn = _NORMALIZE_FNS.get(tp)
+    if normalize_fn is not None:
+        return cast(T, normalize_fn(x))
     if isinstance(x, CodeData):
-        return cast(
-            T,
-            replace(
-                x,
-                blocks=normalize(x.blocks),
-                _additional_args=(),
-                _additional_line=None,
-                _nested=False,
-            ),
-        )
+        return cast(T, _normalize_code_data(x))
     if isinstance(x, Instruction):
-        return cast(
-            T,
-            replace(
-                x,
-                _n_args_override=None,
-                _line_offsets_override=tuple(),
-                arg=normalize(x.arg),
-            ),
-        )
+        return cast(T, _normalize_instruction(x))
     if isinstance(x, Constant):
-        return cast(
-            T,
-            replace(x, _index_override=None, constant=normalize(x.constant)),
-        )
+        return cast(T, _normalize_constant(x))
     if isinstance(x, (Name, Varname, Cellvar)):
-        return cast(T, replace(x, _index_override=None))
+        return cast(T, _normalize_index_override(x))
     if isinstance(x, tuple):
-        return cast(T, tuple(map(normalize, x)))
+        return cast(T, _normalize_tuple(x))
     if isinstance(x, NoArg):
-        return cast(T, NoArg())
+        return cast(T, _normalize_no_arg(x))
     return x
+
+
+def _replace(x: T, **changes: object) -> T:
+    """
+    Like `dataclasses.replace`, but copies the fields directly instead of calling
+    `__init__` again, since none of the dataclasses validate their fields.
+    """
+    new = object.__new__(type(x))
+    new.__dict__.update(x.__dict__)
+    new.__dict__.update(changes)
+    return new
+
+
+def _normalize_code_data(x: CodeData) -> CodeData:
+    return _replace(
+        x,
+        blocks=normalize(x.blocks),
+        _additional_args=(),
+        _additional_line=None,
+        _nested=False,
+    )
+
+
+def _normalize_instruction(x: Instruction) -> Instruction:
+    return _replace(
+        x,
+        _n_args_override=None,
+        _line_offsets_override=tuple(),
+        arg=normalize(x.arg),
+    )
+
+
+def _normalize_constant(x: Constant) -> Constant:
+    return _replace(x, _index_override=None, constant=normalize(x.constant))
+
+
+def _normalize_index_override(x: Any) -> Any:
+    return _replace(x, _index_override=None)
+
+
+def _normalize_tuple(x: tuple) -> tuple:
+    return tuple(map(normalize, x))
+
+
+def _normalize_no_arg(x: NoArg) -> NoArg:
+    # Keep the existing arg if it is already the default, to avoid reallocating
+    return x if x._arg == 0 else NoArg()
+
+
+_LEAF_TYPES: frozenset[type] = frozenset(
+    {
+        int,
+        str,
+        type(None),
+        bool,
+        bytes,
+        float,
+        complex,
+        type(...),
+        frozenset,
+        Jump,
+        Freevar,
+    }
+)
+
+_NORMALIZE_FNS: dict[type, Callable[[Any], object]] = {
+    CodeData: _normalize_code_data,
+    Instruction: _normalize_instruction,
+    Constant: _normalize_constant,
+    Name: _normalize_index_override,
+    Varname: _normalize_index_override,
+    Cellvar: _normalize_index_override,
+    tuple: _normalize_tuple,
+    NoArg: _normalize_no_arg,
+}
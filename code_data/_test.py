@@ -1,12 +1,14 @@
 from __future__ import annotations
 
 import pathlib
+import pickle
 import warnings
 
 import hypothesmith
 from hypothesis import HealthCheck, given, settings
 from pytest import mark, param
 
+from . import Constant
 from ._test_verify_code import verify_code
 
 NEWLINE = "\n"
@@ -76,3 +78,36 @@ def test_generated(source_code):
         warnings.simplefilter("ignore")
         code = compile(source_code, "<string>", "exec")
     verify_code(code)
+
+
+def test_constant_nan_hash():
+    """
+    Constants holding NaN are equal, so they should also hash the same.
+    """
+    # Create separate NaN objects, since each can hash differently
+    assert Constant(float("nan")) == Constant(float("nan"))
+    assert hash(Constant(float("nan"))) == hash(Constant(float("nan")))
+
+
+def test_constant_index_override_hash():
+    """
+    Equal constants with an index override should hash the same.
+    """
+    assert Constant(1, _index_override=1) == Constant(1, _index_override=1)
+    assert hash(Constant(1, _index_override=1)) == hash(Constant(1, _index_override=1))
+
+
+def test_constant_neg_zero_tuple_hash():
+    """
+    Equal constants holding floats inside of a tuple should hash the same.
+    """
+    assert Constant((-0.0,)) == Constant((-0.0,))
+    assert hash(Constant((-0.0,))) == hash(Constant((-0.0,)))
+    assert hash(Constant((float("nan"),))) == hash(Constant((float("nan"),)))
+
+
+def test_constant_pickle():
+    c = Constant((1, float("nan")))
+    new_c = pickle.loads(pickle.dumps(c))
+    assert new_c == c
+    assert hash(new_c) == hash(c)
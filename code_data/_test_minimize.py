@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+from types import CodeType
+from typing import Callable
+
+
+def bisect_failure(
+    source: str,
+    n: int,
+    trim: Callable[[int], str],
+    verify: Callable[[CodeType], None],
+) -> str:
+    """
+    Return the most trimmed source which still fails `verify`, out of the `n`
+    sources `trim(0)` to `trim(n - 1)`, which are ordered from least to most trimmed.
+
+    This assumes that if a trimmed source passes, then trimming it further will
+    also pass, so it can bisect instead of verifying each trimmed source in turn.
+    Sources which don't compile are skipped.
+    """
+    # Every source before lo fails or doesn't compile, and every source from hi on
+    # passes or doesn't compile
+    lo, hi = 0, n
+    while lo < hi:
+        mid = (lo + hi) // 2
+        # Find the first source from the middle which compiles
+        for i in range(mid, hi):
+            minimized_source = trim(i)
+            try:
+                code = compile(minimized_source, "", "exec")
+            except Exception:
+                continue
+            break
+        # If none of them compile, look in the first half
+        else:
+            hi = mid
+            continue
+        try:
+            verify(code)
+        # If this fails, its the new minimal source, and try trimming more
+        except Exception:
+            source = minimized_source
+            lo = i + 1
+        # Otherwise, if it passes, we trimmed too much, so try trimming less
+        else:
+            hi = mid
+    return source
+
+
+def trim_end(lines: list[str]) -> Callable[[int], str]:
+    """
+    Trim for `bisect_failure` which removes `i + 1` lines from the end.
+    """
+    return lambda i: "\n".join(lines[: len(lines) - 1 - i])
+
+
+def trim_start(lines: list[str]) -> Callable[[int], str]:
+    """
+    Trim for `bisect_failure` which removes `i + 1` lines from the beginning.
+    """
+    return lambda i: "\n".join(lines[i + 1 :])
+
+
+def bisect_bad(
+    source: str, trim: Callable[[list[str]], Callable[[int], str]] = trim_end
+) -> tuple[str, int]:
+    """
+    Bisect removing lines from the source with `trim`, with a fake verifier which
+    fails if the source uses `BAD`. Returns the result and the number of calls to
+    the verifier.
+    """
+    lines = source.splitlines()
+    n_verified = 0
+
+    def verify(code: CodeType) -> None:
+        nonlocal n_verified
+        n_verified += 1
+        assert "BAD" not in code.co_names
+
+    result = bisect_failure(source, len(lines) - 1, trim(lines), verify)
+    return result, n_verified
+
+
+def test_bisect_failure():
+    lines = [f"x{i} = 1" for i in range(500)]
+    lines[137] = "BAD = 1"
+    # A line without a body, so any source that still includes it doesn't compile
+    # and is skipped
+    lines[300] = "if x:"
+    source = "\n".join(lines)
+    result, n_verified = bisect_bad(source)
+    assert result == "\n".join(lines[:138])
+    assert n_verified < 20
+
+
+def test_bisect_failure_all_pass():
+    source = "\n".join(["x = 1", "y = 2", "z = 3", "BAD = 1"])
+    assert bisect_bad(source) == (source, 2)
+
+
+def test_bisect_failure_none_compile():
+    # Each trimmed source leaves the parenthesis unclosed
+    source = "\n".join(["BAD = (", "1,", "2,", "3)"])
+    assert bisect_bad(source) == (source, 0)
+
+
+def test_bisect_failure_least_trimmed():
+    source = "\n".join(["x = 1", "y = 2", "BAD = 1", "z = 3"])
+    assert bisect_bad(source)[0] == "x = 1\ny = 2\nBAD = 1"
+
+
+def test_bisect_failure_most_trimmed():
+    source = "\n".join(["BAD = 1", "x = 1", "y = 2", "z = 3"])
+    assert bisect_bad(source)[0] == "BAD = 1"
+
+
+def test_bisect_failure_trim_start():
+    source = "\n".join(["x = 1", "BAD = 1", "y = 2", "z = 3"])
+    assert bisect_bad(source, trim_start)[0] == "BAD = 1\ny = 2\nz = 3"
@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+from types import CodeType
+
 from pytest import mark, param
 
 from ._test import EXAMPLES_DIR
+from ._test_minimize import bisect_failure, trim_end, trim_start
 from ._test_verify_code import verify_code
 from .module_codes import module_codes
 
@@ -42,41 +45,23 @@ def minimize_failure(name: str, source: str):
     # Try to do a simple minimization of the failure by removing lines
     # from the end until it passes
     print("Removing lines from the end until it passes...")
-    for i in reversed(range(1, len(lines))):
-        minimized_source = "\n".join(lines[:i])
-        # If we can't compile, then skip this source
-        try:
-            code = compile(minimized_source, "", "exec")
-        except Exception:
-            continue
-        else:
-            try:
-                verify_code(code, debug=False)
-            # If this fails, its the new minimal source
-            except Exception:
-                source = minimized_source
-            # Otherwise, if it passes, we trimmed too much, we are done
-            else:
-                break
+    source = bisect_failure(
+        source, len(lines) - 1, trim_end(lines), verify_code_no_debug
+    )
     print("Removing lines from the beginning until it passes...")
     lines = source.splitlines()
-    for i in range(1, len(lines)):
-        minimized_source = "\n".join(lines[i:])
-        # If we can't compile, then skip this source
-        try:
-            code = compile(minimized_source, "", "exec")
-        except Exception:
-            continue
-        else:
-            try:
-                verify_code(code, debug=False)
-            # If this fails, its the new minimal source
-            except Exception:
-                source = minimized_source
-            # Otherwise, if it passes, we trimmed too much, we are done
-            else:
-                break
+    source = bisect_failure(
+        source, len(lines) - 1, trim_start(lines), verify_code_no_debug
+    )
     path = EXAMPLES_DIR / f"{name}.py"
     path.write_text(source)
     print(f"Wrote minimized source to {path}")
-    code = compile(source, str(path), "exec")
+    compile(source, str(path), "exec")
+
+
+def verify_code_no_debug(code: CodeType) -> None:
+    """
+    Verify the code without the debugging checks, since we only need to know if it
+    fails.
+    """
+    verify_code(code, debug=False)
@@ -222,7 +222,8 @@ def co_lines_to_mapping(
     """
     offset_to_line: dict[int, Optional[int]] = {}
     for start, end, line in co_lines:
+        line_offset = None if line is None else line - first_line_number
         for offset in range(start, end, 2):
-            offset_to_line[offset] = None if line is None else line - first_line_number
+            offset_to_line[offset] = line_offset
 
     return LineMapping(offset_to_line)
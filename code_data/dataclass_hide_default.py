@@ -31,9 +31,9 @@ class DataclassHideDefault:
 
 
 def field_is_default(f: Field, value: object) -> bool:
-    if f.default_factory != MISSING:  # type: ignore
+    if f.default_factory is not MISSING:
         default = f.default_factory()
-    elif f.default != MISSING:
+    elif f.default is not MISSING:
         default = f.default
     else:
         return False
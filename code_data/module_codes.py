@@ -57,15 +57,15 @@ def all_module_codes_cached() -> list[CodeType]:
     Retrn all the module codes recursively.
     """
     all_code_objects: list[CodeType] = []
-
-    def process(code: CodeType) -> None:
+    # Walk the nested code objects with a stack instead of recursing. Push them
+    # in reverse, so they are still visited in the same order as a recursive walk.
+    stack = [code for _, _, code in reversed(modules_codes_cached())]
+    while stack:
+        code = stack.pop()
         all_code_objects.append(code)
-        for const in code.co_consts:
-            if isinstance(const, CodeType):
-                process(const)
-
-    for name, _, code in modules_codes_cached():
-        process(code)
+        stack.extend(
+            const for const in reversed(code.co_consts) if type(const) is CodeType
+        )
     return all_code_objects
 
 